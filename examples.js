@@ -5,8 +5,7 @@
  * programmatically in your Node.js applications.
  */
 
-const { fixGrammar } = require('./src/grammarFixer');
-const { applyCorrections } = require('./src/index');
+const { fixGrammar, applyCorrections, OllamaConnectionError } = require('./src/grammarFixer');
 
 // Example texts with various grammar errors
 const examples = [
@@ -73,7 +72,7 @@ async function processExample(example) {
   } catch (error) {
     console.error(`\n❌ Error: ${error.message}`);
     
-    if (error.message.includes('Unable to connect to Ollama')) {
+    if (error instanceof OllamaConnectionError) {
       console.error('\nℹ️  Make sure Ollama is running:');
       console.error('   1. Start Ollama: ollama serve');
       console.error('   2. Pull Gemma3: ollama pull gemma3');
@@ -5,7 +5,55 @@
  * It returns structured JSON objects detailing each grammar change.
  */
 
+const crypto = require('crypto');
 const { Ollama } = require('ollama');
+const logger = require('./logger');
+
+// The client for the configured Ollama host is reused across calls so that
+// each request does not pay for client construction and connection setup.
+// Hosts passed in per-call options get a short-lived client instead, so
+// arbitrary host values cannot accumulate clients.
+let defaultClient = null;
+
+// How long Ollama keeps the model loaded after a request, e.g. '30m' or -1
+// to keep it loaded indefinitely. Unset leaves Ollama's own default.
+const MODEL_KEEP_ALIVE = parseKeepAlive(process.env.OLLAMA_KEEP_ALIVE);
+
+// Requests arriving within the batch window are sent to Ollama as a single
+// prompt. A window of 0 disables batching.
+const BATCH_WINDOW_MS = parseInt(process.env.GRAMMAR_BATCH_WINDOW_MS || '20', 10);
+const BATCH_MAX_SIZE = parseInt(process.env.GRAMMAR_BATCH_MAX_SIZE || '8', 10);
+
+// Pending batches keyed by Ollama host and model
+const pendingBatches = new Map();
+
+// Text without any letters (whitespace, numbers, punctuation) has nothing a
+// grammar model could correct
+const LETTER_PATTERN = /\p{L}/u;
+
+// Recently computed corrections, in least to most recently used order
+const CACHE_MAX_SIZE = parseInt(process.env.GRAMMAR_CACHE_SIZE || '4096', 10);
+const correctionCache = new Map();
+
+/**
+ * Error thrown when the text to correct is not valid input
+ */
+class InvalidInputError extends Error {
+  constructor(message) {
+    super(message);
+    this.name = 'InvalidInputError';
+  }
+}
+
+/**
+ * Error thrown when Ollama cannot be reached
+ */
+class OllamaConnectionError extends Error {
+  constructor(message = 'Unable to connect to Ollama. Please ensure Ollama is running (ollama serve)') {
+    super(message);
+    this.name = 'OllamaConnectionError';
+  }
+}
 
 /**
  * Fixes grammar in the provided text using Ollama and Gemma3
@@ -23,39 +71,285 @@ const { Ollama } = require('ollama');
  */
 async function fixGrammar(text, options = {}) {
   if (!text || typeof text !== 'string') {
-    throw new Error('Invalid input: text must be a non-empty string');
+    throw new InvalidInputError('Invalid input: text must be a non-empty string');
   }
 
-  const config = {
-    model: options.model || process.env.OLLAMA_MODEL || 'gemma3',
-    host: options.host || process.env.OLLAMA_HOST || 'http://localhost:11434'
-  };
+  const config = resolveConfig(options);
+  
+  if (!LETTER_PATTERN.test(text)) {
+    return [];
+  }
+  
+  const cacheKey = getCacheKey(text, config);
+  const cached = readCache(cacheKey);
+  if (cached) {
+    return cached;
+  }
   
   try {
     // Call Ollama with Gemma3 to analyze the text
-    const corrections = await analyzeTextWithOllama(text, config);
+    const corrections = await queueForAnalysis(text, config);
+    
+    // An unreadable reply is not the same as "no errors", so it is not cached
+    if (!corrections) {
+      return [];
+    }
     
     // Process and format the corrections
     const formattedCorrections = processCorrections(text, corrections);
     
+    writeCache(cacheKey, formattedCorrections);
     return formattedCorrections;
   } catch (error) {
-    console.error('Error fixing grammar:', error);
+    logger.debug('Error fixing grammar:', error);
     throw error;
   }
 }
 
+/**
+ * Fixes grammar in several texts at once
+ * 
+ * All texts are queued together, so they share Ollama calls instead of
+ * each waiting for its own batch window.
+ * 
+ * @param {Array<string>} texts - The texts to analyze and correct
+ * @param {Object} options - Optional configuration, as for fixGrammar
+ * @returns {Promise<Array<Array>>} Correction arrays, in the same order as texts
+ */
+async function fixGrammarBatch(texts, options = {}) {
+  if (!Array.isArray(texts)) {
+    throw new InvalidInputError('Invalid input: texts must be an array of non-empty strings');
+  }
+  
+  return Promise.all(texts.map(text => fixGrammar(text, options)));
+}
+
+/**
+ * Loads the model into Ollama ahead of the first real request
+ * 
+ * Sends an empty prompt, which makes Ollama load the model without
+ * generating anything, so the first user request does not pay the load time.
+ * 
+ * @param {Object} options - Optional configuration
+ * @param {string} options.model - Model to use (default: 'gemma3')
+ * @param {string} options.host - Ollama host (default: 'http://localhost:11434')
+ * @returns {Promise<void>}
+ */
+async function warmUp(options = {}) {
+  const config = resolveConfig(options);
+  await getOllamaClient(config.host).generate({
+    model: config.model,
+    prompt: '',
+    stream: false,
+    keep_alive: MODEL_KEEP_ALIVE
+  });
+}
+
+/**
+ * Applies corrections to text and returns the corrected version
+ * @param {string} text - Original text
+ * @param {Array} corrections - Array of correction objects
+ * @returns {string} Corrected text
+ */
+function applyCorrections(text, corrections) {
+  if (corrections.length === 0) {
+    return text;
+  }
+
+  // Sort corrections by start position in reverse to apply from end to start
+  const sortedCorrections = [...corrections].sort((a, b) => b.location.start - a.location.start);
+  
+  let correctedText = text;
+  for (const correction of sortedCorrections) {
+    correctedText = 
+      correctedText.substring(0, correction.location.start) +
+      correction.newText +
+      correctedText.substring(correction.location.end);
+  }
+  
+  return correctedText;
+}
+
+/**
+ * Resolves the Ollama configuration from options and environment
+ * 
+ * @private
+ * @param {Object} options - Optional configuration
+ * @returns {Object} Configuration object with model and host
+ */
+function resolveConfig(options) {
+  return {
+    model: options.model || process.env.OLLAMA_MODEL || 'gemma3',
+    host: options.host || process.env.OLLAMA_HOST || 'http://localhost:11434'
+  };
+}
+
+/**
+ * Builds the cache key for a text and configuration
+ * 
+ * @private
+ * @param {string} text - The text being corrected
+ * @param {Object} config - Configuration object
+ * @returns {string} Cache key
+ */
+function getCacheKey(text, config) {
+  return crypto.createHash('sha256')
+    .update(config.host).update('\n')
+    .update(config.model).update('\n')
+    .update(text)
+    .digest('base64');
+}
+
+/**
+ * Looks up cached corrections and marks the entry as recently used
+ * 
+ * @private
+ * @param {string} key - Cache key
+ * @returns {Array|null} A copy of the cached corrections, or null on a miss
+ */
+function readCache(key) {
+  const corrections = correctionCache.get(key);
+  if (!corrections) {
+    return null;
+  }
+  
+  correctionCache.delete(key);
+  correctionCache.set(key, corrections);
+  return corrections.map(correction => ({ ...correction, location: { ...correction.location } }));
+}
+
+/**
+ * Stores corrections, evicting the least recently used entry when full
+ * 
+ * @private
+ * @param {string} key - Cache key
+ * @param {Array} corrections - Formatted corrections to cache
+ */
+function writeCache(key, corrections) {
+  if (!(CACHE_MAX_SIZE > 0)) {
+    return;
+  }
+  
+  correctionCache.set(key, corrections.map(correction => ({ ...correction, location: { ...correction.location } })));
+  if (correctionCache.size > CACHE_MAX_SIZE) {
+    correctionCache.delete(correctionCache.keys().next().value);
+  }
+}
+
+/**
+ * Parses a keep-alive setting, converting plain numbers to seconds
+ * 
+ * @private
+ * @param {string} value - Raw setting, e.g. '300', '-1' or '30m'
+ * @returns {number|string|undefined} Value for Ollama's keep_alive parameter
+ */
+function parseKeepAlive(value) {
+  if (!value) {
+    return undefined;
+  }
+  return /^-?\d+$/.test(value) ? Number(value) : value;
+}
+
+/**
+ * Returns an Ollama client for a host
+ * 
+ * The configured default host shares one client, created on first use;
+ * any other host gets a new client that is not kept.
+ * 
+ * @private
+ * @param {string} host - Ollama host URL
+ * @returns {Ollama} Ollama client instance
+ */
+function getOllamaClient(host) {
+  if (host !== (process.env.OLLAMA_HOST || 'http://localhost:11434')) {
+    return new Ollama({ host });
+  }
+  
+  if (!defaultClient || defaultClient.host !== host) {
+    defaultClient = { host, client: new Ollama({ host }) };
+  }
+  return defaultClient.client;
+}
+
+/**
+ * Queues text for analysis so concurrent requests can share one Ollama call
+ * 
+ * @private
+ * @param {string} text - The text to analyze
+ * @param {Object} config - Configuration object
+ * @returns {Promise<Array|null>} Raw corrections for the text, or null if the reply could not be parsed
+ */
+function queueForAnalysis(text, config) {
+  if (!(BATCH_WINDOW_MS > 0) || !(BATCH_MAX_SIZE > 1)) {
+    return analyzeTextWithOllama(text, config);
+  }
+
+  const key = `${config.host}\n${config.model}`;
+  let batch = pendingBatches.get(key);
+  if (!batch) {
+    batch = { config, items: [], timer: null };
+    pendingBatches.set(key, batch);
+    batch.timer = setTimeout(() => flushBatch(key, batch), BATCH_WINDOW_MS);
+  }
+
+  return new Promise((resolve, reject) => {
+    batch.items.push({ text, resolve, reject });
+    if (batch.items.length >= BATCH_MAX_SIZE) {
+      flushBatch(key, batch);
+    }
+  });
+}
+
+/**
+ * Sends a pending batch to Ollama and settles each queued request
+ * 
+ * @private
+ * @param {string} key - Batch key
+ * @param {Object} batch - The batch to flush
+ */
+async function flushBatch(key, batch) {
+  clearTimeout(batch.timer);
+  if (pendingBatches.get(key) === batch) {
+    pendingBatches.delete(key);
+  }
+
+  const { config, items } = batch;
+
+  // Identical texts in the same window share a single slot in the prompt
+  const waiting = new Map();
+  for (const item of items) {
+    const sameText = waiting.get(item.text);
+    if (sameText) {
+      sameText.push(item);
+    } else {
+      waiting.set(item.text, [item]);
+    }
+  }
+  const texts = [...waiting.keys()];
+
+  try {
+    const results = texts.length === 1
+      ? [await analyzeTextWithOllama(texts[0], config)]
+      : await analyzeBatchWithOllama(texts, config);
+    texts.forEach((text, index) => {
+      for (const item of waiting.get(text)) {
+        item.resolve(results[index]);
+      }
+    });
+  } catch (error) {
+    items.forEach(item => item.reject(error));
+  }
+}
+
 /**
  * Analyzes text using Ollama and Gemma3 model
  * 
  * @private
  * @param {string} text - The text to analyze
  * @param {Object} config - Configuration object
- * @returns {Promise<Array>} Raw corrections from Ollama
+ * @returns {Promise<Array|null>} Raw corrections from Ollama, or null if the reply could not be parsed
  */
 async function analyzeTextWithOllama(text, config) {
-  const ollama = new Ollama({ host: config.host });
-  
   // Create a detailed prompt for grammar correction
   const prompt = `You are a grammar correction assistant. Analyze the following text and identify ALL grammar errors.
 
@@ -77,52 +371,179 @@ Example format:
   }
 ]`;
 
+  const responseText = await generateWithOllama(prompt, config);
+  return parseOllamaResponse(responseText, text);
+}
+
+/**
+ * Analyzes several texts with a single Ollama call
+ * 
+ * @private
+ * @param {Array<string>} texts - The texts to analyze
+ * @param {Object} config - Configuration object
+ * @returns {Promise<Array<Array|null>>} Raw corrections for each text, in input order
+ */
+async function analyzeBatchWithOllama(texts, config) {
+  const entries = texts.map((text, id) => ({ id, text }));
+
+  const prompt = `You are a grammar correction assistant. Analyze each of the following texts independently and identify ALL grammar errors.
+
+For each error, provide the response in STRICT JSON format as an array of objects. Each object must have:
+- "id": the id of the text containing the error
+- "oldText": the exact incorrect text from that text
+- "newText": the corrected text
+- "explanation": brief explanation of the error
+
+Texts:
+${JSON.stringify(entries, null, 2)}
+
+Return ONLY the JSON array, nothing else. If there are no errors, return an empty array [].
+
+Example format:
+[
+  {
+    "id": 0,
+    "oldText": "dont",
+    "newText": "doesn't",
+    "explanation": "Incorrect contraction"
+  }
+]`;
+
+  const responseText = await generateWithOllama(prompt, config);
+  const corrections = parseOllamaResponse(responseText);
+  if (!corrections) {
+    return texts.map(() => null);
+  }
+
+  const results = texts.map(() => []);
+  for (const correction of corrections) {
+    // Models often return the id as a string, e.g. "0"
+    const id = typeof correction.id === 'string' && correction.id.trim() !== ''
+      ? Number(correction.id)
+      : correction.id;
+    if (Number.isInteger(id) && id >= 0 && id < texts.length) {
+      results[id].push(correction);
+    } else {
+      logger.warn('Dropping correction with unknown text id: %j', correction.id);
+    }
+  }
+
+  return results;
+}
+
+/**
+ * Sends a prompt to Ollama and returns the generated text
+ * 
+ * The response is streamed and scanned as it arrives so generation can be
+ * stopped as soon as the JSON array is complete, instead of waiting for
+ * any trailing text the model adds after it.
+ * 
+ * @private
+ * @param {string} prompt - The prompt to send
+ * @param {Object} config - Configuration object
+ * @returns {Promise<string>} The model response text
+ */
+async function generateWithOllama(prompt, config) {
+  const ollama = getOllamaClient(config.host);
+
   try {
-    const response = await ollama.generate({
+    const stream = await ollama.generate({
       model: config.model,
       prompt: prompt,
-      stream: false,
+      stream: true,
+      keep_alive: MODEL_KEEP_ALIVE,
       options: {
         temperature: 0.3,
         top_p: 0.9
       }
     });
 
-    return parseOllamaResponse(response.response, text);
+    const scanner = createArrayScanner();
+    let responseText = '';
+    for await (const part of stream) {
+      responseText += part.response;
+      if (scanner.push(part.response)) {
+        if (!part.done && typeof stream.abort === 'function') {
+          stream.abort();
+        }
+        break;
+      }
+    }
+
+    return responseText;
   } catch (error) {
     // If Ollama is not available, throw a more descriptive error
     if (error.code === 'ECONNREFUSED' || 
         error.cause?.code === 'ECONNREFUSED' ||
         error.message?.includes('connect') ||
         error.message?.includes('fetch failed')) {
-      throw new Error('Unable to connect to Ollama. Please ensure Ollama is running (ollama serve)');
+      throw new OllamaConnectionError();
     }
     throw error;
   }
 }
 
+/**
+ * Creates an incremental scanner that detects when the first top-level JSON
+ * array in a streamed response has been closed
+ * 
+ * @private
+ * @returns {Object} Scanner with a push(chunk) method returning true once complete
+ */
+function createArrayScanner() {
+  let depth = 0;
+  let inString = false;
+  let escaped = false;
+
+  return {
+    push(chunk) {
+      for (const char of chunk) {
+        if (inString) {
+          if (escaped) {
+            escaped = false;
+          } else if (char === '\\') {
+            escaped = true;
+          } else if (char === '"') {
+            inString = false;
+          }
+        } else if (char === '"' && depth > 0) {
+          inString = true;
+        } else if (char === '[') {
+          depth++;
+        } else if (char === ']' && depth > 0) {
+          depth--;
+          if (depth === 0) {
+            return true;
+          }
+        }
+      }
+      return false;
+    }
+  };
+}
+
 /**
  * Parses the response from Ollama to extract corrections
  * 
  * @private
  * @param {string} responseText - The response text from Ollama
  * @param {string} originalText - The original text for validation
- * @returns {Array} Array of correction objects
+ * @returns {Array|null} Array of correction objects, or null if the response could not be parsed
  */
 function parseOllamaResponse(responseText, originalText) {
   try {
     // Extract JSON from the response (it might have extra text)
     let jsonMatch = responseText.match(/\[[\s\S]*\]/);
     if (!jsonMatch) {
-      console.warn('No JSON array found in Ollama response, returning empty corrections');
-      return [];
+      logger.warn('No JSON array found in Ollama response, returning empty corrections');
+      return null;
     }
 
     const corrections = JSON.parse(jsonMatch[0]);
     
     if (!Array.isArray(corrections)) {
-      console.warn('Ollama response is not an array, returning empty corrections');
-      return [];
+      logger.warn('Ollama response is not an array, returning empty corrections');
+      return null;
     }
 
     // Validate and enrich corrections with position information
@@ -133,8 +554,8 @@ function parseOllamaResponse(responseText, originalText) {
              typeof correction.newText === 'string';
     });
   } catch (error) {
-    console.warn('Failed to parse Ollama response:', error.message);
-    return [];
+    logger.warn('Failed to parse Ollama response:', error.message);
+    return null;
   }
 }
 
@@ -148,41 +569,78 @@ function parseOllamaResponse(responseText, originalText) {
  */
 function processCorrections(originalText, rawCorrections) {
   const formattedCorrections = [];
+  const searchState = new Map();
   let searchStartIndex = 0;
   
   for (const correction of rawCorrections) {
     // Find the position of the old text in the original
-    const position = findSubstringPosition(originalText, correction.oldText, searchStartIndex);
+    const position = findNextOccurrence(originalText, correction.oldText, searchStartIndex, searchState);
     
     if (position) {
-      const formattedCorrection = {
-        location: {
-          start: position.start,
-          end: position.end
-        },
-        oldText: correction.oldText,
-        newText: correction.newText
-      };
-      
-      // Add explanation if available
-      if (correction.explanation) {
-        formattedCorrection.explanation = correction.explanation;
-      }
+      // The position object doubles as the location, and each correction is
+      // built in a single literal instead of adding explanation afterwards.
+      // Text fields were already checked by parseOllamaResponse, so the
+      // result is valid by construction.
+      const formattedCorrection = correction.explanation
+        ? {
+          location: position,
+          oldText: correction.oldText,
+          newText: correction.newText,
+          explanation: correction.explanation
+        }
+        : {
+          location: position,
+          oldText: correction.oldText,
+          newText: correction.newText
+        };
       
-      // Validate before adding
-      if (isValidCorrection(formattedCorrection)) {
-        formattedCorrections.push(formattedCorrection);
-        // Move search index forward to handle multiple occurrences
-        searchStartIndex = position.end;
-      }
+      formattedCorrections.push(formattedCorrection);
+      // Move search index forward to handle multiple occurrences
+      searchStartIndex = position.end;
     } else {
-      console.warn(`Could not find "${correction.oldText}" in original text`);
+      logger.warn('Could not find "%s" in original text', correction.oldText);
     }
   }
   
   return formattedCorrections;
 }
 
+/**
+ * Finds the next occurrence of a substring, remembering the last search for it
+ * 
+ * Searches start at startIndex and stop at the first match, as with
+ * findSubstringPosition. Search positions only move forward, so once a
+ * substring has no match from some offset on, later lookups for it are
+ * answered without scanning the text again.
+ * 
+ * @private
+ * @param {string} text - The text to search in
+ * @param {string} substring - The substring to find
+ * @param {number} startIndex - Starting index for search
+ * @param {Map<string, Object>} searchState - Last search offset and result, by substring
+ * @returns {Object} Object with start and end positions
+ */
+function findNextOccurrence(text, substring, startIndex, searchState) {
+  const previous = searchState.get(substring);
+  let start;
+  
+  if (previous && startIndex >= previous.from && (previous.start === -1 || previous.start >= startIndex)) {
+    start = previous.start;
+  } else {
+    start = text.indexOf(substring, startIndex);
+    searchState.set(substring, { from: startIndex, start });
+  }
+  
+  if (start === -1) {
+    return null;
+  }
+  
+  return {
+    start,
+    end: start + substring.length
+  };
+}
+
 /**
  * Helper function to find the position of a substring in text
  * 
@@ -233,7 +691,14 @@ function isValidCorrection(correction) {
 
 module.exports = {
   fixGrammar,
+  fixGrammarBatch,
+  applyCorrections,
+  warmUp,
+  InvalidInputError,
+  OllamaConnectionError,
   // Export helper functions for testing
+  processCorrections,
+  createArrayScanner,
   isValidCorrection,
   findSubstringPosition
 };
@@ -4,7 +4,7 @@
  * Entry point for the grammar fixer application
  */
 
-const { fixGrammar } = require('./grammarFixer');
+const { fixGrammar, fixGrammarBatch, applyCorrections, OllamaConnectionError } = require('./grammarFixer');
 const fs = require('fs').promises;
 const path = require('path');
 const readline = require('readline');
@@ -47,31 +47,6 @@ async function readFromFile(filePath) {
   }
 }
 
-/**
- * Applies corrections to text and returns the corrected version
- * @param {string} text - Original text
- * @param {Array} corrections - Array of correction objects
- * @returns {string} Corrected text
- */
-function applyCorrections(text, corrections) {
-  if (corrections.length === 0) {
-    return text;
-  }
-
-  // Sort corrections by start position in reverse to apply from end to start
-  const sortedCorrections = [...corrections].sort((a, b) => b.location.start - a.location.start);
-  
-  let correctedText = text;
-  for (const correction of sortedCorrections) {
-    correctedText = 
-      correctedText.substring(0, correction.location.start) +
-      correction.newText +
-      correctedText.substring(correction.location.end);
-  }
-  
-  return correctedText;
-}
-
 /**
  * Main function to demonstrate the grammar fixer
  */
@@ -128,8 +103,14 @@ async function main() {
       console.log('    --file, -f <path>    Read from file');
       console.log('    [text]               Process inline text\n');
       
-      for (const text of exampleTexts) {
-        await processText(text, 'example');
+      // Check all examples together, then print each result in order
+      const results = fixGrammarBatch(exampleTexts);
+      results.catch(() => {
+        // Reported for each text by processText
+      });
+      
+      for (const [index, text] of exampleTexts.entries()) {
+        await processText(text, 'example', results.then(corrections => corrections[index]));
       }
     } else {
       await processText(inputText, inputSource);
@@ -150,12 +131,13 @@ async function main() {
  * Processes a single text input
  * @param {string} text - The text to process
  * @param {string} source - The source of the text
+ * @param {Promise<Array>} [pendingCorrections] - Corrections already requested for the text
  */
-async function processText(text, source) {
+async function processText(text, source, pendingCorrections) {
   try {
     console.log(`\nOriginal text: "${text.substring(0, 100)}${text.length > 100 ? '...' : ''}"`);
     
-    const corrections = await fixGrammar(text);
+    const corrections = await (pendingCorrections || fixGrammar(text));
     
     if (corrections.length === 0) {
       console.log('✓ No grammar errors found!\n');
@@ -181,7 +163,7 @@ async function processText(text, source) {
     }
   } catch (error) {
     console.error(`Error processing text: ${error.message}`);
-    if (error.message.includes('Unable to connect to Ollama')) {
+    if (error instanceof OllamaConnectionError) {
       console.error('\nPlease ensure:');
       console.error('1. Ollama is installed and running (ollama serve)');
       console.error('2. The Gemma3 model is available (ollama pull gemma3)');
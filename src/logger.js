@@ -0,0 +1,31 @@
+/**
+ * Logger Module
+ * 
+ * Minimal leveled logger for the service. The level is read once from
+ * LOG_LEVEL (error, warn, info or debug; default: info), so calls below the
+ * configured level cost only a comparison.
+ */
+
+const LEVELS = { error: 0, warn: 1, info: 2, debug: 3 };
+
+const level = LEVELS[(process.env.LOG_LEVEL || 'info').toLowerCase()] ?? LEVELS.info;
+
+/**
+ * Checks whether messages at a level would be logged
+ * 
+ * Use this to skip building expensive log arguments.
+ * 
+ * @param {string} name - Level name
+ * @returns {boolean} True if the level is enabled
+ */
+function isLevelEnabled(name) {
+  return LEVELS[name] <= level;
+}
+
+module.exports = {
+  isLevelEnabled,
+  error: (...args) => level >= LEVELS.error && console.error(...args),
+  warn: (...args) => level >= LEVELS.warn && console.warn(...args),
+  info: (...args) => level >= LEVELS.info && console.log(...args),
+  debug: (...args) => level >= LEVELS.debug && console.debug(...args)
+};
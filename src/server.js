@@ -4,12 +4,61 @@
  * Provides REST API endpoints for the grammar fixing service
  */
 
+const cluster = require('cluster');
+const crypto = require('crypto');
 const http = require('http');
-const { fixGrammar } = require('./grammarFixer');
-const { applyCorrections } = require('./index');
+const os = require('os');
+const zlib = require('zlib');
+const {
+  fixGrammar,
+  fixGrammarBatch,
+  applyCorrections,
+  warmUp,
+  InvalidInputError,
+  OllamaConnectionError
+} = require('./grammarFixer');
+const logger = require('./logger');
 
 const PORT = process.env.PORT || 3000;
 const HOST = process.env.HOST || '0.0.0.0';
+const WORKERS = parseInt(process.env.WEB_CONCURRENCY || String(os.availableParallelism()), 10);
+// Longer than the usual 60s load balancer idle timeout, so the proxy rather
+// than the server decides when an idle connection is closed
+const KEEP_ALIVE_TIMEOUT_MS = parseInt(process.env.KEEP_ALIVE_TIMEOUT_MS || '65000', 10);
+
+// Upper bound on the number of texts accepted in one /grammar/fix request
+const MAX_BATCH_TEXTS = 100;
+
+const SECURITY_HEADERS = {
+  'X-Content-Type-Options': 'nosniff',
+  'X-Frame-Options': 'DENY',
+  'X-XSS-Protection': '1; mode=block',
+  'Strict-Transport-Security': 'max-age=31536000; includeSubDomains'
+};
+
+// Smaller responses are sent uncompressed; the saving is not worth the work
+const COMPRESS_MIN_SIZE = 512;
+
+// Supported response encodings, in order of preference
+const ENCODERS = {
+  br: (body, callback) => zlib.brotliCompress(body, {
+    params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 4 }
+  }, callback),
+  gzip: (body, callback) => zlib.gzip(body, callback)
+};
+
+// The API info document never changes at runtime, so it is serialized once
+const API_INFO_BODY = Buffer.from(JSON.stringify({
+  service: 'grammar-fixer-ollama-gemma3',
+  version: '1.0.0',
+  endpoints: {
+    health: 'GET /health',
+    fixGrammar: 'POST /grammar/fix',
+    applyCorrections: 'POST /grammar/apply'
+  },
+  documentation: 'See openapi.yaml for full API specification'
+}));
+const API_INFO_ETAG = `"${crypto.createHash('sha1').update(API_INFO_BODY).digest('base64')}"`;
 
 /**
  * Parse JSON body from request
@@ -18,14 +67,16 @@ const HOST = process.env.HOST || '0.0.0.0';
  */
 function parseBody(req) {
   return new Promise((resolve, reject) => {
-    let body = '';
+    const chunks = [];
     
     req.on('data', chunk => {
-      body += chunk.toString();
+      chunks.push(chunk);
     });
     
     req.on('end', () => {
       try {
+        // Decode once so multi-byte characters split across chunks survive
+        const body = Buffer.concat(chunks).toString('utf8');
         if (body) {
           resolve(JSON.parse(body));
         } else {
@@ -40,21 +91,227 @@ function parseBody(req) {
   });
 }
 
+/**
+ * Check whether a value is a plain JSON object
+ * @param {*} value - The value to check
+ * @returns {boolean} True for non-null, non-array objects
+ */
+function isJsonObject(value) {
+  return typeof value === 'object' && value !== null && !Array.isArray(value);
+}
+
+/**
+ * Validate a grammar fix request body
+ * @param {*} body - Parsed request body
+ * @returns {string|null} Error message, or null if the body is valid
+ */
+function validateFixRequest(body) {
+  if (!isJsonObject(body)) {
+    return 'Request body must be a JSON object';
+  }
+  if (body.texts !== undefined) {
+    if (body.text !== undefined) {
+      return 'Invalid input: provide either text or texts, not both';
+    }
+    if (!Array.isArray(body.texts) || body.texts.length === 0 || body.texts.length > MAX_BATCH_TEXTS) {
+      return `Invalid input: texts must be an array of 1 to ${MAX_BATCH_TEXTS} non-empty strings`;
+    }
+    if (!body.texts.every(text => typeof text === 'string' && text.length > 0)) {
+      return 'Invalid input: texts must only contain non-empty strings';
+    }
+  } else if (body.text === undefined) {
+    return 'Missing required field: text';
+  } else if (typeof body.text !== 'string' || body.text.length === 0) {
+    return 'Invalid input: text must be a non-empty string';
+  }
+  if (body.options !== undefined) {
+    if (!isJsonObject(body.options)) {
+      return 'Invalid input: options must be an object';
+    }
+    for (const field of ['model', 'host']) {
+      if (body.options[field] !== undefined && typeof body.options[field] !== 'string') {
+        return `Invalid input: options.${field} must be a string`;
+      }
+    }
+  }
+  return null;
+}
+
+/**
+ * Validate an apply corrections request body
+ * @param {*} body - Parsed request body
+ * @returns {string|null} Error message, or null if the body is valid
+ */
+function validateApplyRequest(body) {
+  if (!isJsonObject(body)) {
+    return 'Request body must be a JSON object';
+  }
+  if (body.text === undefined || body.corrections === undefined) {
+    return 'Missing required fields: text and corrections';
+  }
+  if (typeof body.text !== 'string') {
+    return 'Invalid input: text must be a string';
+  }
+  if (!Array.isArray(body.corrections)) {
+    return 'Invalid input: corrections must be an array';
+  }
+  for (const correction of body.corrections) {
+    if (!isJsonObject(correction) ||
+        !isJsonObject(correction.location) ||
+        !Number.isInteger(correction.location.start) ||
+        !Number.isInteger(correction.location.end) ||
+        typeof correction.oldText !== 'string' ||
+        typeof correction.newText !== 'string') {
+      return 'Invalid input: each correction needs an integer location.start, location.end and string oldText and newText';
+    }
+    const { start, end } = correction.location;
+    if (start < 0 || start > end || end > body.text.length) {
+      return 'Invalid input: correction locations must satisfy 0 <= start <= end <= text length';
+    }
+  }
+  return null;
+}
+
+/**
+ * Read and validate a JSON request body, sending a 400 response on failure
+ * @param {http.IncomingMessage} req - The request object
+ * @param {http.ServerResponse} res - The response object
+ * @param {Function} validate - Validator returning an error message or null
+ * @returns {Promise<Object|null>} The parsed body, or null if a response was sent
+ */
+async function readValidBody(req, res, validate) {
+  let body;
+  try {
+    body = await parseBody(req);
+  } catch (error) {
+    sendJson(res, 400, {
+      error: 'Bad Request',
+      message: error.message
+    });
+    return null;
+  }
+  
+  const validationError = validate(body);
+  if (validationError) {
+    sendJson(res, 400, {
+      error: 'Bad Request',
+      message: validationError
+    });
+    return null;
+  }
+  
+  return body;
+}
+
+/**
+ * Pick a response encoding the client accepts
+ * @param {string} acceptEncoding - Value of the Accept-Encoding header
+ * @returns {string|null} Encoding name, or null to send the body as is
+ */
+function selectEncoding(acceptEncoding) {
+  if (!acceptEncoding) {
+    return null;
+  }
+  
+  const accepted = new Set();
+  for (const entry of acceptEncoding.split(',')) {
+    const [name, ...params] = entry.trim().toLowerCase().split(';');
+    const rejected = params.some(param => /^\s*q=0(\.0*)?\s*$/.test(param));
+    if (!rejected) {
+      accepted.add(name);
+    }
+  }
+  
+  return Object.keys(ENCODERS).find(name => accepted.has(name)) || null;
+}
+
 /**
  * Send JSON response
+ * 
+ * Bodies of at least COMPRESS_MIN_SIZE bytes are compressed with brotli or
+ * gzip when the client accepts it.
+ * 
  * @param {http.ServerResponse} res - The response object
  * @param {number} statusCode - HTTP status code
  * @param {Object} data - Data to send
  */
 function sendJson(res, statusCode, data) {
-  res.writeHead(statusCode, {
+  const body = Buffer.from(JSON.stringify(data));
+  const headers = {
+    'Content-Type': 'application/json',
+    'Vary': 'Accept-Encoding',
+    ...SECURITY_HEADERS
+  };
+  
+  const encoding = body.length >= COMPRESS_MIN_SIZE
+    ? selectEncoding(res.req?.headers['accept-encoding'])
+    : null;
+  if (!encoding) {
+    res.writeHead(statusCode, { ...headers, 'Content-Length': body.length });
+    res.end(body);
+    return;
+  }
+  
+  ENCODERS[encoding](body, (error, compressed) => {
+    if (error) {
+      res.writeHead(statusCode, { ...headers, 'Content-Length': body.length });
+      res.end(body);
+      return;
+    }
+    res.writeHead(statusCode, {
+      ...headers,
+      'Content-Encoding': encoding,
+      'Content-Length': compressed.length
+    });
+    res.end(compressed);
+  });
+}
+
+/**
+ * Check an If-None-Match header against an entity tag
+ * 
+ * Uses weak comparison, so W/"x" matches "x", and treats * as a match.
+ * 
+ * @param {string} ifNoneMatch - Value of the If-None-Match header
+ * @param {string} etag - The current entity tag
+ * @returns {boolean} True if the client's copy is current
+ */
+function etagMatches(ifNoneMatch, etag) {
+  if (!ifNoneMatch) {
+    return false;
+  }
+  
+  const opaqueTag = etag.replace(/^W\//, '');
+  return ifNoneMatch.split(',').some(entry => {
+    const tag = entry.trim();
+    return tag === '*' || tag.replace(/^W\//, '') === opaqueTag;
+  });
+}
+
+/**
+ * Handle API info endpoint
+ * @param {http.IncomingMessage} req - The request object
+ * @param {http.ServerResponse} res - The response object
+ */
+function handleApiInfo(req, res) {
+  const headers = {
+    'Cache-Control': 'public, max-age=86400',
+    'ETag': API_INFO_ETAG,
+    ...SECURITY_HEADERS
+  };
+  
+  if (etagMatches(req.headers['if-none-match'], API_INFO_ETAG)) {
+    res.writeHead(304, headers);
+    res.end();
+    return;
+  }
+  
+  res.writeHead(200, {
     'Content-Type': 'application/json',
-    'X-Content-Type-Options': 'nosniff',
-    'X-Frame-Options': 'DENY',
-    'X-XSS-Protection': '1; mode=block',
-    'Strict-Transport-Security': 'max-age=31536000; includeSubDomains'
+    'Content-Length': API_INFO_BODY.length,
+    ...headers
   });
-  res.end(JSON.stringify(data, null, 2));
+  res.end(API_INFO_BODY);
 }
 
 /**
@@ -87,17 +344,24 @@ async function handleHealthCheck(res) {
  */
 async function handleFixGrammar(req, res) {
   try {
-    const body = await parseBody(req);
+    const body = await readValidBody(req, res, validateFixRequest);
+    if (!body) {
+      return;
+    }
     
-    if (!body.text) {
-      sendJson(res, 400, {
-        error: 'Bad Request',
-        message: 'Missing required field: text'
+    const options = body.options || {};
+    
+    if (body.texts) {
+      const results = await fixGrammarBatch(body.texts, options);
+      sendJson(res, 200, {
+        results: results.map(corrections => ({
+          corrections,
+          count: corrections.length
+        }))
       });
       return;
     }
     
-    const options = body.options || {};
     const corrections = await fixGrammar(body.text, options);
     
     sendJson(res, 200, {
@@ -105,7 +369,22 @@ async function handleFixGrammar(req, res) {
       count: corrections.length
     });
   } catch (error) {
-    console.error('Error in handleFixGrammar:', error);
+    if (error instanceof InvalidInputError) {
+      sendJson(res, 400, {
+        error: 'Bad Request',
+        message: error.message
+      });
+      return;
+    }
+    if (error instanceof OllamaConnectionError) {
+      sendJson(res, 503, {
+        error: 'Service Unavailable',
+        message: error.message
+      });
+      return;
+    }
+    
+    logger.error('Error in handleFixGrammar:', error);
     sendJson(res, 500, {
       error: 'Internal Server Error',
       message: error.message
@@ -120,13 +399,8 @@ async function handleFixGrammar(req, res) {
  */
 async function handleApplyCorrections(req, res) {
   try {
-    const body = await parseBody(req);
-    
-    if (!body.text || !body.corrections) {
-      sendJson(res, 400, {
-        error: 'Bad Request',
-        message: 'Missing required fields: text and corrections'
-      });
+    const body = await readValidBody(req, res, validateApplyRequest);
+    if (!body) {
       return;
     }
     
@@ -138,7 +412,7 @@ async function handleApplyCorrections(req, res) {
       corrections: body.corrections
     });
   } catch (error) {
-    console.error('Error in handleApplyCorrections:', error);
+    logger.error('Error in handleApplyCorrections:', error);
     sendJson(res, 500, {
       error: 'Internal Server Error',
       message: error.message
@@ -163,14 +437,11 @@ function handleNotFound(res) {
  * @param {string} allowedMethods - Comma-separated list of allowed methods
  */
 function handleMethodNotAllowed(res, allowedMethods) {
-  res.writeHead(405, {
-    'Content-Type': 'application/json',
-    'Allow': allowedMethods
-  });
-  res.end(JSON.stringify({
+  res.setHeader('Allow', allowedMethods);
+  sendJson(res, 405, {
     error: 'Method Not Allowed',
     message: `Allowed methods: ${allowedMethods}`
-  }, null, 2));
+  });
 }
 
 /**
@@ -181,7 +452,9 @@ function handleMethodNotAllowed(res, allowedMethods) {
 async function requestHandler(req, res) {
   const { method, url } = req;
   
-  console.log(`${new Date().toISOString()} - ${method} ${url}`);
+  if (logger.isLevelEnabled('debug')) {
+    logger.debug(`${new Date().toISOString()} - ${method} ${url}`);
+  }
   
   // Health check endpoint
   if (url === '/health' || url === '/health/') {
@@ -210,17 +483,7 @@ async function requestHandler(req, res) {
   // Root endpoint - API info
   if (url === '/' || url === '') {
     if (method === 'GET') {
-      sendJson(res, 200, {
-        service: 'grammar-fixer-ollama-gemma3',
-        version: '1.0.0',
-        endpoints: {
-          health: 'GET /health',
-          fixGrammar: 'POST /grammar/fix',
-          applyCorrections: 'POST /grammar/apply'
-        },
-        documentation: 'See openapi.yaml for full API specification'
-      });
-      return;
+      return handleApiInfo(req, res);
     }
     return handleMethodNotAllowed(res, 'GET');
   }
@@ -229,31 +492,51 @@ async function requestHandler(req, res) {
   handleNotFound(res);
 }
 
+/**
+ * Ask Ollama to load the model in the background, unless OLLAMA_WARMUP=false
+ */
+function warmUpModel() {
+  if (process.env.OLLAMA_WARMUP === 'false') {
+    return;
+  }
+  
+  warmUp()
+    .then(() => logger.info('Model loaded'))
+    .catch(error => logger.warn('Model warm-up failed:', error.message));
+}
+
 /**
  * Create and start the HTTP server
  */
 function startServer() {
   const server = http.createServer(requestHandler);
+  server.keepAliveTimeout = KEEP_ALIVE_TIMEOUT_MS;
+  server.headersTimeout = KEEP_ALIVE_TIMEOUT_MS + 1000;
   
   server.listen(PORT, HOST, () => {
-    console.log(`Grammar Fixer Microservice running on http://${HOST}:${PORT}`);
-    console.log(`Health check: http://${HOST}:${PORT}/health`);
-    console.log(`Environment: ${process.env.NODE_ENV || 'development'}`);
-    console.log(`Ollama Host: ${process.env.OLLAMA_HOST || 'http://localhost:11434'}`);
-    console.log(`Ollama Model: ${process.env.OLLAMA_MODEL || 'gemma3'}`);
+    logger.info(`Grammar Fixer Microservice running on http://${HOST}:${PORT}`);
+    logger.info(`Health check: http://${HOST}:${PORT}/health`);
+    logger.info(`Environment: ${process.env.NODE_ENV || 'development'}`);
+    logger.info(`Ollama Host: ${process.env.OLLAMA_HOST || 'http://localhost:11434'}`);
+    logger.info(`Ollama Model: ${process.env.OLLAMA_MODEL || 'gemma3'}`);
+    
+    // Under cluster the primary has already asked Ollama to load the model
+    if (cluster.isPrimary) {
+      warmUpModel();
+    }
   });
   
   // Graceful shutdown
   const shutdown = () => {
-    console.log('\nShutting down gracefully...');
+    logger.info('\nShutting down gracefully...');
     server.close(() => {
-      console.log('Server closed');
+      logger.info('Server closed');
       process.exit(0);
     });
     
     // Force close after 10 seconds
     setTimeout(() => {
-      console.error('Forced shutdown after timeout');
+      logger.error('Forced shutdown after timeout');
       process.exit(1);
     }, 10000);
   };
@@ -264,12 +547,82 @@ function startServer() {
   return server;
 }
 
+/**
+ * Start the server across multiple worker processes
+ * 
+ * Each worker runs its own HTTP server on the shared port so slow Ollama
+ * calls and request handling are spread across CPU cores. Set
+ * WEB_CONCURRENCY=1 to run a single process.
+ * 
+ * @param {number} workers - Number of worker processes to start
+ */
+function startCluster(workers = WORKERS) {
+  if (!(workers > 1)) {
+    return startServer();
+  }
+  
+  logger.info(`Primary ${process.pid} starting ${workers} workers`);
+  
+  const listening = new Set();
+  let shuttingDown = false;
+  
+  cluster.on('listening', (worker) => {
+    listening.add(worker.id);
+  });
+  
+  cluster.on('exit', (worker, code, signal) => {
+    if (shuttingDown) {
+      if (Object.keys(cluster.workers).length === 0) {
+        logger.info('All workers stopped');
+        process.exit(0);
+      }
+      return;
+    }
+    
+    // A worker that never started listening will fail the same way again
+    if (!listening.has(worker.id)) {
+      logger.error(`Worker ${worker.process.pid} failed to start (${signal || code})`);
+      process.exit(1);
+    }
+    
+    logger.error(`Worker ${worker.process.pid} exited (${signal || code}), restarting`);
+    listening.delete(worker.id);
+    cluster.fork();
+  });
+  
+  for (let i = 0; i < workers; i++) {
+    cluster.fork();
+  }
+  
+  // Ollama shares one loaded model between all workers, so load it once
+  warmUpModel();
+  
+  const shutdown = () => {
+    if (shuttingDown) {
+      return;
+    }
+    shuttingDown = true;
+    logger.info('\nStopping workers...');
+    for (const worker of Object.values(cluster.workers)) {
+      worker.process.kill('SIGTERM');
+    }
+  };
+  
+  process.on('SIGTERM', shutdown);
+  process.on('SIGINT', shutdown);
+}
+
 // Start server if this file is run directly
 if (require.main === module) {
-  startServer();
+  if (cluster.isPrimary) {
+    startCluster();
+  } else {
+    startServer();
+  }
 }
 
 module.exports = {
   startServer,
+  startCluster,
   requestHandler
 };
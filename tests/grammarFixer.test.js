@@ -0,0 +1,453 @@
+/**
+ * Tests for Grammar Fixer Module
+ * 
+ * Ollama is replaced by a stub so these tests do not need a running server.
+ */
+
+const mockGenerate = jest.fn();
+const mockOllama = jest.fn().mockImplementation(() => ({ generate: mockGenerate }));
+jest.mock('ollama', () => ({ Ollama: mockOllama }));
+
+const {
+  fixGrammar,
+  fixGrammarBatch,
+  processCorrections,
+  findSubstringPosition,
+  createArrayScanner,
+  InvalidInputError,
+  OllamaConnectionError
+} = require('../src/grammarFixer');
+
+/**
+ * Builds a streamed Ollama response that yields the given chunks
+ * @param {...string} chunks - Response text chunks
+ * @returns {AsyncGenerator<Object>} Stream of generate response parts
+ */
+function streamOf(...chunks) {
+  return (async function* () {
+    for (const [index, chunk] of chunks.entries()) {
+      yield { response: chunk, done: index === chunks.length - 1 };
+    }
+  })();
+}
+
+/**
+ * Loads a fresh copy of the module, reading its settings from the given environment
+ * @param {Object} env - Environment variables to set while loading
+ * @returns {Object} The module exports
+ */
+function loadGrammarFixer(env = {}) {
+  const previous = {};
+  for (const [key, value] of Object.entries(env)) {
+    previous[key] = process.env[key];
+    process.env[key] = value;
+  }
+  
+  let grammarFixer;
+  try {
+    jest.isolateModules(() => {
+      grammarFixer = require('../src/grammarFixer');
+    });
+  } finally {
+    for (const [key, value] of Object.entries(previous)) {
+      if (value === undefined) {
+        delete process.env[key];
+      } else {
+        process.env[key] = value;
+      }
+    }
+  }
+  return grammarFixer;
+}
+
+describe('Grammar Fixer Module', () => {
+  beforeEach(() => {
+    mockGenerate.mockReset();
+    mockOllama.mockClear();
+  });
+
+  describe('Ollama client', () => {
+    test('should reuse one client for the configured host', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_BATCH_WINDOW_MS: '0', GRAMMAR_CACHE_SIZE: '0' });
+      mockGenerate.mockImplementation(async () => streamOf('[]'));
+
+      await fixGrammar('First text');
+      await fixGrammar('Second text');
+
+      expect(mockOllama).toHaveBeenCalledTimes(1);
+    });
+
+    test('should not keep clients for hosts passed per call', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_BATCH_WINDOW_MS: '0', GRAMMAR_CACHE_SIZE: '0' });
+      mockGenerate.mockImplementation(async () => streamOf('[]'));
+
+      await fixGrammar('First text', { host: 'http://other-host:11434' });
+      await fixGrammar('Second text', { host: 'http://other-host:11434' });
+
+      expect(mockOllama).toHaveBeenCalledTimes(2);
+    });
+  });
+
+  describe('fast path', () => {
+    test('should return no corrections for text without letters without calling Ollama', async () => {
+      const corrections = await fixGrammar('  123, 456!  ');
+
+      expect(corrections).toEqual([]);
+      expect(mockGenerate).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('processCorrections', () => {
+    let warnSpy;
+
+    beforeEach(() => {
+      warnSpy = jest.spyOn(console, 'warn').mockImplementation();
+    });
+
+    afterEach(() => {
+      warnSpy.mockRestore();
+    });
+
+    test('should locate repeated corrections in order', () => {
+      const text = 'She dont like it and he dont either';
+      const corrections = processCorrections(text, [
+        { oldText: 'dont', newText: "doesn't" },
+        { oldText: 'dont', newText: "doesn't", explanation: 'Incorrect contraction' }
+      ]);
+
+      expect(corrections).toEqual([
+        { location: { start: 4, end: 8 }, oldText: 'dont', newText: "doesn't" },
+        {
+          location: { start: 24, end: 28 },
+          oldText: 'dont',
+          newText: "doesn't",
+          explanation: 'Incorrect contraction'
+        }
+      ]);
+    });
+
+    test('should match the sequential substring search', () => {
+      const text = 'aaa dont x dont y go dont';
+      const raw = [
+        { oldText: 'dont', newText: 'a' },
+        { oldText: 'missing', newText: 'b' },
+        { oldText: 'aa', newText: 'c' },
+        { oldText: 'dont', newText: 'd' },
+        { oldText: 'go', newText: 'e' },
+        { oldText: 'dont', newText: 'f' },
+        { oldText: 'dont', newText: 'g' }
+      ];
+
+      const expected = [];
+      let searchStartIndex = 0;
+      for (const correction of raw) {
+        const position = findSubstringPosition(text, correction.oldText, searchStartIndex);
+        if (position) {
+          expected.push({ location: position, oldText: correction.oldText, newText: correction.newText });
+          searchStartIndex = position.end;
+        }
+      }
+
+      expect(processCorrections(text, raw)).toEqual(expected);
+    });
+
+    test('should search from the current position and not rescan for missing text', () => {
+      const text = 'the cat saw the dog and the bird';
+      const raw = [
+        { oldText: 'missing', newText: 'a' },
+        { oldText: 'the', newText: 'The' },
+        { oldText: 'missing', newText: 'b' },
+        { oldText: 'the', newText: 'The' },
+        { oldText: 'missing', newText: 'c' },
+        { oldText: 'the', newText: 'The' }
+      ];
+      const indexOfSpy = jest.spyOn(String.prototype, 'indexOf');
+
+      let corrections;
+      try {
+        corrections = processCorrections(text, raw);
+      } finally {
+        indexOfSpy.mockRestore();
+      }
+
+      const searches = indexOfSpy.mock.calls.filter(([substring]) => substring === 'missing' || substring === 'the');
+      expect(corrections.map(correction => correction.location.start)).toEqual([0, 12, 24]);
+      expect(searches).toEqual([['missing', 0], ['the', 0], ['the', 3], ['the', 15]]);
+    });
+  });
+
+  describe('createArrayScanner', () => {
+    test('should complete when the top-level array closes', () => {
+      const scanner = createArrayScanner();
+
+      expect(scanner.push('Here you go: [{"oldText": "a", "n": [1, 2]}')).toBe(false);
+      expect(scanner.push(']')).toBe(true);
+    });
+
+    test('should ignore brackets and escaped quotes inside strings', () => {
+      const scanner = createArrayScanner();
+
+      expect(scanner.push('[{"oldText": "a ] \\" [", ')).toBe(false);
+      expect(scanner.push('"newText": "b ]"}')).toBe(false);
+      expect(scanner.push(']')).toBe(true);
+    });
+
+    test('should handle an escape split across chunks', () => {
+      const scanner = createArrayScanner();
+
+      expect(scanner.push('["a \\')).toBe(false);
+      expect(scanner.push('"]')).toBe(false);
+      expect(scanner.push('"]')).toBe(true);
+    });
+  });
+
+  describe('streamed responses', () => {
+    test('should stop reading once the JSON array is complete', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_BATCH_WINDOW_MS: '0', GRAMMAR_CACHE_SIZE: '0' });
+      let readTrailingText = false;
+      mockGenerate.mockImplementation(async () => (async function* () {
+        yield { response: '[{"oldText": "dont", ', done: false };
+        yield { response: '"newText": "doesn\'t"}]', done: false };
+        readTrailingText = true;
+        yield { response: ' I fixed one error.', done: true };
+      })());
+
+      const corrections = await fixGrammar('She dont like apples');
+
+      expect(corrections).toEqual([{ location: { start: 4, end: 8 }, oldText: 'dont', newText: "doesn't" }]);
+      expect(readTrailingText).toBe(false);
+    });
+  });
+
+  describe('request batching', () => {
+    test('should send concurrent texts in one call and split the reply by id', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_CACHE_SIZE: '0' });
+      mockGenerate.mockImplementation(async () => streamOf(JSON.stringify([
+        { id: 1, oldText: 'go', newText: 'goes' },
+        { id: 0, oldText: 'dont', newText: "doesn't" }
+      ])));
+
+      const [first, second] = await Promise.all([
+        fixGrammar('She dont like apples'),
+        fixGrammar('He go to school')
+      ]);
+
+      expect(mockGenerate).toHaveBeenCalledTimes(1);
+      expect(first).toEqual([{ location: { start: 4, end: 8 }, oldText: 'dont', newText: "doesn't" }]);
+      expect(second).toEqual([{ location: { start: 3, end: 5 }, oldText: 'go', newText: 'goes' }]);
+    });
+
+    test('should accept ids returned as strings and drop unknown ids', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_CACHE_SIZE: '0' });
+      const warnSpy = jest.spyOn(console, 'warn').mockImplementation();
+      mockGenerate.mockImplementation(async () => streamOf(JSON.stringify([
+        { id: '0', oldText: 'dont', newText: "doesn't" },
+        { id: 7, oldText: 'go', newText: 'goes' }
+      ])));
+
+      const [first, second] = await Promise.all([
+        fixGrammar('She dont like apples'),
+        fixGrammar('He go to school')
+      ]);
+
+      expect(first).toHaveLength(1);
+      expect(second).toEqual([]);
+      expect(warnSpy).toHaveBeenCalledTimes(1);
+      warnSpy.mockRestore();
+    });
+
+    test('should send identical texts in a batch only once', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_CACHE_SIZE: '0' });
+      mockGenerate.mockImplementation(async () => streamOf(JSON.stringify([
+        { id: 0, oldText: 'dont', newText: "doesn't" }
+      ])));
+
+      const [first, second, third] = await Promise.all([
+        fixGrammar('She dont like apples'),
+        fixGrammar('He go to school'),
+        fixGrammar('She dont like apples')
+      ]);
+
+      const { prompt } = mockGenerate.mock.calls[0][0];
+      expect(mockGenerate).toHaveBeenCalledTimes(1);
+      expect(prompt.split('She dont like apples')).toHaveLength(2);
+      expect(first).toEqual(third);
+      expect(first).toHaveLength(1);
+      expect(second).toEqual([]);
+    });
+
+    test('should use the single-text prompt when every text is the same', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_CACHE_SIZE: '0' });
+      mockGenerate.mockImplementation(async () => streamOf(JSON.stringify([
+        { oldText: 'dont', newText: "doesn't" }
+      ])));
+
+      const results = await Promise.all([
+        fixGrammar('She dont like apples'),
+        fixGrammar('She dont like apples')
+      ]);
+
+      expect(mockGenerate).toHaveBeenCalledTimes(1);
+      expect(mockGenerate.mock.calls[0][0].prompt).toContain('Original text: "She dont like apples"');
+      expect(results[0]).toEqual(results[1]);
+      expect(results[0]).toHaveLength(1);
+    });
+
+    test('should flush as soon as the batch is full', async () => {
+      const { fixGrammar } = loadGrammarFixer({
+        GRAMMAR_CACHE_SIZE: '0',
+        GRAMMAR_BATCH_WINDOW_MS: '60000',
+        GRAMMAR_BATCH_MAX_SIZE: '2'
+      });
+      mockGenerate.mockImplementation(async () => streamOf('[]'));
+
+      const results = await Promise.all([fixGrammar('First text'), fixGrammar('Second text')]);
+
+      expect(results).toEqual([[], []]);
+      expect(mockGenerate).toHaveBeenCalledTimes(1);
+    });
+
+    test('should reject every request in a batch when the call fails', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_CACHE_SIZE: '0' });
+      mockGenerate.mockRejectedValue(new Error('model failed'));
+
+      const results = await Promise.allSettled([fixGrammar('First text'), fixGrammar('Second text')]);
+
+      expect(results.map(result => result.status)).toEqual(['rejected', 'rejected']);
+      expect(results[1].reason.message).toBe('model failed');
+      expect(mockGenerate).toHaveBeenCalledTimes(1);
+    });
+  });
+
+  describe('fixGrammarBatch', () => {
+    test('should return corrections in input order from one call', async () => {
+      const { fixGrammarBatch } = loadGrammarFixer({ GRAMMAR_CACHE_SIZE: '0' });
+      mockGenerate.mockImplementation(async () => streamOf(JSON.stringify([
+        { id: 2, oldText: 'go', newText: 'goes' },
+        { id: 0, oldText: 'dont', newText: "doesn't" }
+      ])));
+
+      const results = await fixGrammarBatch(['She dont like apples', 'This is fine.', 'He go to school']);
+
+      expect(mockGenerate).toHaveBeenCalledTimes(1);
+      expect(results).toEqual([
+        [{ location: { start: 4, end: 8 }, oldText: 'dont', newText: "doesn't" }],
+        [],
+        [{ location: { start: 3, end: 5 }, oldText: 'go', newText: 'goes' }]
+      ]);
+    });
+
+    test('should reject with InvalidInputError when a text is invalid', async () => {
+      // Without a batch window the valid text is not left queued after the test
+      const { fixGrammarBatch, InvalidInputError } = loadGrammarFixer({ GRAMMAR_BATCH_WINDOW_MS: '0' });
+      mockGenerate.mockImplementation(async () => streamOf('[]'));
+
+      await expect(fixGrammarBatch(['She dont like apples', ''])).rejects.toBeInstanceOf(InvalidInputError);
+    });
+  });
+
+  describe('result cache', () => {
+    const reply = async () => streamOf(JSON.stringify([{ oldText: 'dont', newText: "doesn't" }]));
+
+    test('should answer repeated texts from the cache', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_BATCH_WINDOW_MS: '0' });
+      mockGenerate.mockImplementation(reply);
+
+      const first = await fixGrammar('She dont like apples');
+      const second = await fixGrammar('She dont like apples');
+
+      expect(second).toEqual(first);
+      expect(mockGenerate).toHaveBeenCalledTimes(1);
+    });
+
+    test('should copy entries so callers cannot change cached results', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_BATCH_WINDOW_MS: '0' });
+      mockGenerate.mockImplementation(reply);
+
+      const first = await fixGrammar('She dont like apples');
+      first[0].location.start = 99;
+      const second = await fixGrammar('She dont like apples');
+      second[0].newText = 'changed';
+      const third = await fixGrammar('She dont like apples');
+
+      expect(third).toEqual([{ location: { start: 4, end: 8 }, oldText: 'dont', newText: "doesn't" }]);
+    });
+
+    test('should evict the least recently used entry when full', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_BATCH_WINDOW_MS: '0', GRAMMAR_CACHE_SIZE: '2' });
+      mockGenerate.mockImplementation(reply);
+
+      await fixGrammar('Text A dont');
+      await fixGrammar('Text B dont');
+      // A hit makes A the most recently used, so adding C evicts B
+      await fixGrammar('Text A dont');
+      await fixGrammar('Text C dont');
+      expect(mockGenerate).toHaveBeenCalledTimes(3);
+
+      await fixGrammar('Text A dont');
+      expect(mockGenerate).toHaveBeenCalledTimes(3);
+
+      await fixGrammar('Text B dont');
+      expect(mockGenerate).toHaveBeenCalledTimes(4);
+    });
+
+    test('should not cache a reply that could not be parsed', async () => {
+      const { fixGrammar } = loadGrammarFixer({ GRAMMAR_BATCH_WINDOW_MS: '0' });
+      const warnSpy = jest.spyOn(console, 'warn').mockImplementation();
+      const replies = [async () => streamOf('Sorry, I cannot do that.'), reply];
+      mockGenerate.mockImplementation(() => replies.shift()());
+
+      const first = await fixGrammar('She dont like apples');
+      const second = await fixGrammar('She dont like apples');
+      warnSpy.mockRestore();
+
+      expect(first).toEqual([]);
+      expect(second).toEqual([{ location: { start: 4, end: 8 }, oldText: 'dont', newText: "doesn't" }]);
+      expect(mockGenerate).toHaveBeenCalledTimes(2);
+    });
+
+    test('should not cache batch slots from a reply that could not be parsed', async () => {
+      const { fixGrammar } = loadGrammarFixer({});
+      const warnSpy = jest.spyOn(console, 'warn').mockImplementation();
+      mockGenerate.mockImplementation(async () => streamOf('[{"id": 0, "oldText": '));
+
+      const results = await Promise.all([fixGrammar('She dont like apples'), fixGrammar('He go to school')]);
+      mockGenerate.mockImplementation(reply);
+      const retried = await fixGrammar('She dont like apples');
+      warnSpy.mockRestore();
+
+      expect(results).toEqual([[], []]);
+      expect(retried).toHaveLength(1);
+      expect(mockGenerate).toHaveBeenCalledTimes(2);
+    });
+  });
+
+  describe('InvalidInputError', () => {
+    test('should be thrown for empty text', async () => {
+      await expect(fixGrammar('')).rejects.toBeInstanceOf(InvalidInputError);
+    });
+
+    test('should keep the descriptive message for non-string text', async () => {
+      await expect(fixGrammar(42)).rejects.toThrow('Invalid input: text must be a non-empty string');
+    });
+
+    test('should be thrown by fixGrammarBatch for a non-array input', async () => {
+      await expect(fixGrammarBatch('She dont like apples')).rejects.toBeInstanceOf(InvalidInputError);
+    });
+
+    test('should remain a regular Error', () => {
+      const error = new InvalidInputError('Invalid input: test');
+      expect(error).toBeInstanceOf(Error);
+      expect(error.name).toBe('InvalidInputError');
+    });
+  });
+
+  describe('OllamaConnectionError', () => {
+    test('should carry the default connection message', () => {
+      const error = new OllamaConnectionError();
+      expect(error).toBeInstanceOf(Error);
+      expect(error.name).toBe('OllamaConnectionError');
+      expect(error.message).toContain('Unable to connect to Ollama');
+    });
+  });
+});
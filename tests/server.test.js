@@ -0,0 +1,269 @@
+/**
+ * Tests for Server Module
+ */
+
+const mockGenerate = jest.fn();
+jest.mock('ollama', () => ({
+  Ollama: jest.fn().mockImplementation(() => ({ generate: mockGenerate }))
+}));
+
+const http = require('http');
+const zlib = require('zlib');
+const { requestHandler } = require('../src/server');
+
+describe('Server Module', () => {
+  let server;
+  let port;
+
+  beforeAll(() => new Promise(resolve => {
+    server = http.createServer(requestHandler);
+    server.listen(0, '127.0.0.1', () => {
+      port = server.address().port;
+      resolve();
+    });
+  }));
+
+  afterAll(() => new Promise(resolve => server.close(resolve)));
+
+  /**
+   * Send a request to the test server and collect the raw response body
+   */
+  function request(method, path, { headers = {}, body } = {}) {
+    return new Promise((resolve, reject) => {
+      const req = http.request({ host: '127.0.0.1', port, method, path, headers }, res => {
+        const chunks = [];
+        res.on('data', chunk => chunks.push(chunk));
+        res.on('end', () => resolve({
+          status: res.statusCode,
+          headers: res.headers,
+          body: Buffer.concat(chunks)
+        }));
+      });
+      req.on('error', reject);
+      req.end(body);
+    });
+  }
+
+  describe('GET /', () => {
+    test('should send the API info with an ETag', async () => {
+      const res = await request('GET', '/');
+
+      expect(res.status).toBe(200);
+      expect(res.headers.etag).toBeDefined();
+      expect(JSON.parse(res.body.toString()).service).toBe('grammar-fixer-ollama-gemma3');
+    });
+
+    test('should answer a matching If-None-Match with 304', async () => {
+      const { headers } = await request('GET', '/');
+      const res = await request('GET', '/', { headers: { 'If-None-Match': headers.etag } });
+
+      expect(res.status).toBe(304);
+      expect(res.headers.etag).toBe(headers.etag);
+      expect(res.body).toHaveLength(0);
+    });
+
+    test('should answer 304 when the ETag is in a list, weak or matched by *', async () => {
+      const { headers } = await request('GET', '/');
+
+      for (const ifNoneMatch of [`"x", ${headers.etag}`, `W/${headers.etag}`, '*']) {
+        const res = await request('GET', '/', { headers: { 'If-None-Match': ifNoneMatch } });
+        expect(res.status).toBe(304);
+      }
+    });
+
+    test('should send the body for a stale ETag', async () => {
+      const res = await request('GET', '/', { headers: { 'If-None-Match': '"stale"' } });
+
+      expect(res.status).toBe(200);
+      expect(res.body.length).toBeGreaterThan(0);
+    });
+  });
+
+  describe('request validation', () => {
+    const postJson = (path, body) => request('POST', path, {
+      headers: { 'Content-Type': 'application/json' },
+      body: typeof body === 'string' ? body : JSON.stringify(body)
+    });
+    const correction = (start, end, fields = {}) => ({
+      location: { start, end },
+      oldText: 'dont',
+      newText: "doesn't",
+      ...fields
+    });
+
+    test('should reject invalid JSON', async () => {
+      const res = await postJson('/grammar/fix', '{"text": ');
+
+      expect(res.status).toBe(400);
+      expect(JSON.parse(res.body.toString()).message).toBe('Invalid JSON');
+    });
+
+    test('should reject a text that is not a string', async () => {
+      const res = await postJson('/grammar/fix', { text: 123 });
+
+      expect(res.status).toBe(400);
+    });
+
+    test('should reject text and texts together', async () => {
+      const res = await postJson('/grammar/fix', { text: 'She dont', texts: ['He go'] });
+
+      expect(res.status).toBe(400);
+    });
+
+    test('should apply corrections with valid locations', async () => {
+      const res = await postJson('/grammar/apply', {
+        text: 'She dont like apples',
+        corrections: [correction(4, 8)]
+      });
+
+      expect(res.status).toBe(200);
+      expect(JSON.parse(res.body.toString()).correctedText).toBe("She doesn't like apples");
+    });
+
+    test('should reject a negative start', async () => {
+      const res = await postJson('/grammar/apply', {
+        text: 'She dont like apples',
+        corrections: [correction(-1, 8)]
+      });
+
+      expect(res.status).toBe(400);
+    });
+
+    test('should reject a start after the end', async () => {
+      const res = await postJson('/grammar/apply', {
+        text: 'She dont like apples',
+        corrections: [correction(8, 4)]
+      });
+
+      expect(res.status).toBe(400);
+    });
+
+    test('should reject an end past the text', async () => {
+      const res = await postJson('/grammar/apply', {
+        text: 'She dont',
+        corrections: [correction(4, 20)]
+      });
+
+      expect(res.status).toBe(400);
+    });
+
+    test('should reject a correction without oldText', async () => {
+      const res = await postJson('/grammar/apply', {
+        text: 'She dont like apples',
+        corrections: [correction(4, 8, { oldText: undefined })]
+      });
+
+      expect(res.status).toBe(400);
+    });
+  });
+
+  describe('request bodies', () => {
+    test('should keep multi-byte characters split across chunks', async () => {
+      const text = 'Café naïve — 日本語 😀';
+      const body = Buffer.from(JSON.stringify({ text, corrections: [] }));
+      // Split inside the three-byte encoding of the first Japanese character
+      const splitAt = body.indexOf(Buffer.from('日')) + 1;
+
+      const res = await new Promise((resolve, reject) => {
+        const req = http.request({
+          host: '127.0.0.1',
+          port,
+          method: 'POST',
+          path: '/grammar/apply',
+          headers: { 'Content-Type': 'application/json' }
+        }, response => {
+          const chunks = [];
+          response.on('data', chunk => chunks.push(chunk));
+          response.on('end', () => resolve({
+            status: response.statusCode,
+            body: Buffer.concat(chunks)
+          }));
+        });
+        req.on('error', reject);
+        req.write(body.subarray(0, splitAt));
+        setTimeout(() => req.end(body.subarray(splitAt)), 20);
+      });
+
+      expect(res.status).toBe(200);
+      expect(JSON.parse(res.body.toString()).originalText).toBe(text);
+    });
+  });
+
+  describe('Ollama errors', () => {
+    beforeEach(() => {
+      mockGenerate.mockReset();
+    });
+
+    test('should answer 503 when Ollama cannot be reached', async () => {
+      const error = new Error('connection refused');
+      error.code = 'ECONNREFUSED';
+      mockGenerate.mockRejectedValue(error);
+
+      const res = await request('POST', '/grammar/fix', {
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ text: 'She dont like apples' })
+      });
+
+      expect(res.status).toBe(503);
+      expect(JSON.parse(res.body.toString()).error).toBe('Service Unavailable');
+    });
+
+    test('should answer 500 for other errors', async () => {
+      const errorSpy = jest.spyOn(console, 'error').mockImplementation();
+      mockGenerate.mockRejectedValue(new Error('model "gemma3" not found'));
+
+      const res = await request('POST', '/grammar/fix', {
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ text: 'He go to school' })
+      });
+      errorSpy.mockRestore();
+
+      expect(res.status).toBe(500);
+      expect(JSON.parse(res.body.toString()).message).toBe('model "gemma3" not found');
+    });
+  });
+
+  describe('response compression', () => {
+    const applyBody = text => JSON.stringify({ text, corrections: [] });
+    const largeText = 'She dont like apples. '.repeat(50);
+    const postApply = (text, acceptEncoding) => request('POST', '/grammar/apply', {
+      headers: { 'Content-Type': 'application/json', 'Accept-Encoding': acceptEncoding },
+      body: applyBody(text)
+    });
+
+    test('should gzip large responses when gzip is accepted', async () => {
+      const res = await postApply(largeText, 'gzip');
+
+      expect(res.headers['content-encoding']).toBe('gzip');
+      expect(res.headers.vary).toBe('Accept-Encoding');
+      expect(JSON.parse(zlib.gunzipSync(res.body).toString()).correctedText).toBe(largeText);
+    });
+
+    test('should prefer brotli when both encodings are accepted', async () => {
+      const res = await postApply(largeText, 'gzip, deflate, br');
+
+      expect(res.headers['content-encoding']).toBe('br');
+      expect(JSON.parse(zlib.brotliDecompressSync(res.body).toString()).correctedText).toBe(largeText);
+    });
+
+    test('should skip encodings refused with q=0', async () => {
+      const res = await postApply(largeText, 'gzip;q=0, br');
+
+      expect(res.headers['content-encoding']).toBe('br');
+    });
+
+    test('should send the body as is when every encoding is refused', async () => {
+      const res = await postApply(largeText, 'gzip;q=0');
+
+      expect(res.headers['content-encoding']).toBeUndefined();
+      expect(JSON.parse(res.body.toString()).correctedText).toBe(largeText);
+    });
+
+    test('should not compress small responses', async () => {
+      const res = await postApply('She dont', 'gzip, br');
+
+      expect(res.headers['content-encoding']).toBeUndefined();
+      expect(res.headers.vary).toBe('Accept-Encoding');
+    });
+  });
+});